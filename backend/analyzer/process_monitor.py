@@ -3,11 +3,12 @@ Process monitoring and analysis module.
 Provides functionality for analyzing process health, detecting stuck processes,
 memory leaks, and generating alerts for abnormal behavior.
 """
-import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from instrumentation import PROCESS_MONITOR_DURATION, load_json
+
 
 class ProcessMonitor:
     """Monitor and analyze process behavior for anomalies."""
@@ -19,6 +20,7 @@ class ProcessMonitor:
         self.memory_threshold_critical = 20
         self.memory_threshold_warning = 10
         
+    @PROCESS_MONITOR_DURATION.time(method="get_current_processes")
     def get_current_processes(self) -> List[Dict]:
         """Get current running processes from the latest snapshot."""
         try:
@@ -28,12 +30,13 @@ class ProcessMonitor:
             
             latest_file = files[-1]
             with open(f"{self.snapshot_folder}/{latest_file}") as f:
-                data = json.load(f)
+                data = load_json(f)
             
             return data.get("processes", [])
         except Exception:
             return []
     
+    @PROCESS_MONITOR_DURATION.time(method="get_process_by_pid")
     def get_process_by_pid(self, pid: int) -> Optional[Dict]:
         """Get detailed information about a specific process by PID."""
         processes = self.get_current_processes()
@@ -42,6 +45,7 @@ class ProcessMonitor:
                 return proc
         return None
     
+    @PROCESS_MONITOR_DURATION.time(method="get_alerts")
     def get_alerts(self) -> List[Dict]:
         """Get all current alerts from processes with issues."""
         processes = self.get_current_processes()
@@ -56,6 +60,7 @@ class ProcessMonitor:
         
         return alerts
     
+    @PROCESS_MONITOR_DURATION.time(method="analyze_resource_usage")
     def analyze_resource_usage(self) -> Dict:
         """Analyze system resource usage and identify problems."""
         processes = self.get_current_processes()
@@ -135,6 +140,7 @@ class ProcessMonitor:
             ]
         }
     
+    @PROCESS_MONITOR_DURATION.time(method="detect_stuck_processes")
     def detect_stuck_processes(self, history_window: int = 3) -> List[Dict]:
         """
         Detect processes that have been using high CPU for a sustained period.
@@ -153,7 +159,7 @@ class ProcessMonitor:
             
             for snapshot_file in recent_files:
                 with open(f"{self.snapshot_folder}/{snapshot_file}") as f:
-                    data = json.load(f)
+                    data = load_json(f)
                 
                 for proc in data.get("processes", []):
                     pid = proc.get("pid")
@@ -0,0 +1,5 @@
+"""
+Benchmark suite for DriftX.
+Provides a synthetic snapshot generator and micro-benchmarks and load tests
+for the collector, snapshot storage, analyzer, drift engine and API.
+"""
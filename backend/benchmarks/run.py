@@ -0,0 +1,496 @@
+"""
+Benchmark runner.
+Runs micro-benchmarks for the collector, snapshot storage, analyzer and drift
+engine against synthetic snapshots, plus a local load test of the FastAPI
+endpoints with concurrent pollers. Results are written as JSON so runs can be
+compared; with --baseline, medians are compared against a previous run with
+the same parameters and the exit code is 1 if any benchmark with enough
+samples regressed past the threshold (2 if the parameters differ).
+
+Usage (from the backend directory):
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --archive-snapshots 10000 --baseline bench.json
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import SnapshotGenerator, generate_archive, generate_snapshot
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Parameters that do not change what is measured; all others must match the baseline
+UNCOMPARED_PARAMS = ("only", "skip", "threshold", "output", "baseline", "ignore_param_mismatch")
+
+# Benchmarks with fewer samples than this are reported but never fail the run
+MIN_GATED_SAMPLES = 3
+
+API_ENDPOINTS = [
+    "/latest-snapshot",
+    "/drift",
+    "/timeline",
+    "/current-processes",
+    "/alerts",
+    "/resource-analysis",
+    "/snapshot-info",
+    "/metrics"
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict:
+    return {
+        "iterations": len(samples),
+        "mean_seconds": statistics.fmean(samples),
+        "median_seconds": statistics.median(samples),
+        "min_seconds": min(samples),
+        "max_seconds": max(samples),
+        "p95_seconds": percentile(samples, 95),
+        "stdev_seconds": statistics.stdev(samples) if len(samples) > 1 else 0.0
+    }
+
+
+def time_calls(fn: Callable, iterations: int, warmup: int = 1,
+               setup: Optional[Callable] = None) -> Dict:
+    """
+    Call fn warmup + iterations times and summarize the timed iterations.
+    setup, if given, runs untimed before every call.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+class BenchContext:
+    """Shared configuration and lazily generated synthetic snapshot folders."""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix="driftx-bench-")
+        self._monitor_folder = None
+        self._archive_folder = None
+
+    @property
+    def monitor_folder(self) -> str:
+        """
+        A handful of large snapshots, enough for stuck-process history.
+        Laid out as <dir>/snapshots so the API server can run from <dir>.
+        """
+        if self._monitor_folder is None:
+            self._monitor_folder = os.path.join(self.workdir, "monitor", "snapshots")
+            generate_archive(self._monitor_folder, snapshot_count=5,
+                             process_count=self.args.processes, seed=self.args.seed)
+        return self._monitor_folder
+
+    @property
+    def archive_folder(self) -> str:
+        """A long archive of smaller snapshots for offline drift analysis."""
+        if self._archive_folder is None:
+            self._archive_folder = os.path.join(self.workdir, "archive")
+            generate_archive(self._archive_folder, snapshot_count=self.args.archive_snapshots,
+                             process_count=self.args.archive_processes, seed=self.args.seed)
+        return self._archive_folder
+
+    def cleanup(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def bench_collect(ctx: BenchContext) -> Dict:
+    from collector.snapshot import collect_system_state
+
+    # Each call blocks for 1s in psutil.cpu_percent(interval=1)
+    return {"collector.collect_system_state": time_calls(collect_system_state, ctx.args.collect_iterations, warmup=0)}
+
+
+def bench_save(ctx: BenchContext) -> Dict:
+    from collector import snapshot
+
+    max_snapshots = 1000
+    data = generate_snapshot(ctx.args.processes, seed=ctx.args.seed)
+    folder = os.path.join(ctx.workdir, "save")
+    os.makedirs(folder, exist_ok=True)
+    # Older snapshots with distinct timestamps, so every save pushes the folder
+    # past max_snapshots and cleanup globs, sorts and removes the oldest file
+    prefill = {
+        f"snapshot_{(datetime(2000, 1, 1) + timedelta(seconds=i)).strftime('%Y%m%d_%H%M%S')}.json"
+        for i in range(max_snapshots)
+    }
+
+    def refill():
+        for name in os.listdir(folder):
+            if name not in prefill:
+                os.remove(os.path.join(folder, name))
+        for name in prefill:
+            path = os.path.join(folder, name)
+            if not os.path.exists(path):
+                with open(path, "w") as f:
+                    f.write("{}")
+
+    original_folder = snapshot.SNAPSHOT_FOLDER
+    snapshot.SNAPSHOT_FOLDER = folder
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = time_calls(lambda: snapshot.save_snapshot(data, max_snapshots=max_snapshots),
+                                ctx.args.iterations, setup=refill)
+    finally:
+        snapshot.SNAPSHOT_FOLDER = original_folder
+    result["processes"] = ctx.args.processes
+    result["max_snapshots"] = max_snapshots
+    return {"collector.save_snapshot": result}
+
+
+def bench_analyzer(ctx: BenchContext) -> Dict:
+    from analyzer.process_monitor import ProcessMonitor
+
+    monitor = ProcessMonitor(ctx.monitor_folder)
+    iterations = ctx.args.iterations
+    return {
+        "analyzer.analyze_resource_usage": time_calls(monitor.analyze_resource_usage, iterations),
+        "analyzer.detect_stuck_processes": time_calls(monitor.detect_stuck_processes, iterations)
+    }
+
+
+def bench_drift(ctx: BenchContext) -> Dict:
+    from drift_engine.analyze import analyze
+    from drift_engine.compare import diff_snapshots
+
+    generator = SnapshotGenerator(ctx.args.processes, seed=ctx.args.seed)
+    old = generator.snapshot(datetime(2026, 1, 1))
+    new = generator.snapshot(datetime(2026, 1, 1, 0, 5))
+
+    folder = ctx.archive_folder
+    iterations = ctx.args.archive_iterations
+    serial = time_calls(lambda: analyze(folder, workers=1), iterations)
+    parallel = time_calls(lambda: analyze(folder, workers=ctx.args.workers), iterations)
+    serial["snapshots"] = parallel["snapshots"] = ctx.args.archive_snapshots
+    parallel["workers"] = ctx.args.workers
+    parallel["speedup"] = serial["median_seconds"] / parallel["median_seconds"]
+
+    return {
+        "drift.diff_snapshots": time_calls(lambda: diff_snapshots(old, new), ctx.args.iterations),
+        "drift.analyze_archive_serial": serial,
+        "drift.analyze_archive_parallel": parallel
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _poll(port: int, paths: List[str], offset: int, deadline: float, latencies: Dict, errors: Dict):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        latencies.setdefault(path, []).append(time.perf_counter() - start)
+        if not ok:
+            errors[path] = errors.get(path, 0) + 1
+    conn.close()
+
+
+def _wait_for_server(process: subprocess.Popen, port: int, timeout: float = 15):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"API server did not start within {timeout:.0f} seconds")
+
+
+def bench_api(ctx: BenchContext) -> Dict:
+    """
+    Load-test the API served by uvicorn in a separate process, so the pollers
+    do not compete with the server for the GIL.
+    """
+    folder = ctx.monitor_folder
+    latest = sorted(os.listdir(folder))[-1]
+    with open(os.path.join(folder, latest)) as f:
+        pid = json.load(f)["processes"][0]["pid"]
+    # (metric label, request path) for every endpoint the pollers cycle through
+    targets = [(path, path) for path in API_ENDPOINTS] + [("/process-details/{pid}", f"/process-details/{pid}")]
+    paths = [path for _, path in targets]
+
+    port = _free_port()
+    # main.py reads ./snapshots, so run the server from the synthetic folder's
+    # parent, and keep the scheduler from taking real snapshots
+    env = dict(os.environ, AUTO_SNAPSHOT_ENABLED="false")
+    log_path = os.path.join(ctx.workdir, "api-server.log")
+    with open(log_path, "w") as log:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=os.path.dirname(folder), env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    try:
+        try:
+            _wait_for_server(server, port)
+        except RuntimeError as e:
+            with open(log_path) as log:
+                raise RuntimeError(f"{e}: {log.read()[-2000:]}") from None
+
+        pollers = ctx.args.pollers
+        latencies = [{} for _ in range(pollers)]
+        errors = [{} for _ in range(pollers)]
+        deadline = time.perf_counter() + ctx.args.duration
+        threads = [
+            threading.Thread(target=_poll, args=(port, paths, i, deadline, latencies[i], errors[i]))
+            for i in range(pollers)
+        ]
+        wall_start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_start
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    results = {}
+    all_samples = []
+    total_errors = 0
+    for label, path in targets:
+        samples = [s for poller in latencies for s in poller.get(path, [])]
+        path_errors = sum(poller.get(path, 0) for poller in errors)
+        total_errors += path_errors
+        if not samples:
+            continue
+        all_samples.extend(samples)
+        result = summarize(samples)
+        result["errors"] = path_errors
+        results[f"api.GET {label}"] = result
+
+    if all_samples:
+        total = summarize(all_samples)
+        total.update({
+            "pollers": pollers,
+            "duration_seconds": wall,
+            "errors": total_errors,
+            "requests_per_second": len(all_samples) / wall,
+            "processes_per_snapshot": ctx.args.processes
+        })
+        results["api.total"] = total
+    return results
+
+
+BENCHMARKS = {
+    "collect": bench_collect,
+    "save": bench_save,
+    "analyzer": bench_analyzer,
+    "drift": bench_drift,
+    "api": bench_api
+}
+
+
+def load_baseline(path: str) -> Dict:
+    """Load a previous results file, raising ValueError if it is unusable."""
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except OSError as e:
+        raise ValueError(f"cannot read baseline {path}: {e.strerror}")
+    except ValueError as e:
+        raise ValueError(f"baseline {path} is not valid JSON: {e}")
+    if not isinstance(baseline, dict) or not isinstance(baseline.get("benchmarks"), dict):
+        raise ValueError(f"baseline {path} is not a benchmark results file")
+    return baseline
+
+
+def param_mismatches(results: Dict, baseline: Dict) -> Dict:
+    """Parameters that differ between this run and the baseline, as (baseline, current)."""
+    current = results["meta"]["params"]
+    previous = baseline.get("meta", {}).get("params", {})
+    return {
+        key: (previous.get(key), current.get(key))
+        for key in sorted(set(current) | set(previous))
+        if key not in UNCOMPARED_PARAMS and previous.get(key) != current.get(key)
+    }
+
+
+def compare_results(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare median timings against a baseline run. Only benchmarks with at
+    least MIN_GATED_SAMPLES samples in both runs can count as regressions.
+    """
+    rows = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("median_seconds") or "median_seconds" not in current:
+            continue
+        ratio = current["median_seconds"] / previous["median_seconds"]
+        gated = min(current.get("iterations", 0), previous.get("iterations", 0)) >= MIN_GATED_SAMPLES
+        rows.append({
+            "name": name,
+            "baseline_median_seconds": previous["median_seconds"],
+            "median_seconds": current["median_seconds"],
+            "ratio": round(ratio, 3),
+            "gated": gated,
+            "regression": gated and ratio > 1 + threshold
+        })
+    return rows
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Run DriftX benchmarks against synthetic snapshots."
+    )
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--skip", nargs="+", choices=list(BENCHMARKS), default=[], help="Skip these benchmarks")
+    parser.add_argument("--processes", type=int, default=10000, help="Processes per snapshot for storage, analyzer and API benchmarks")
+    parser.add_argument("--archive-snapshots", type=int, default=1000, help="Snapshots in the drift analysis archive")
+    parser.add_argument("--archive-processes", type=int, default=300, help="Processes per snapshot in the drift analysis archive")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed iterations per micro-benchmark")
+    parser.add_argument("--archive-iterations", type=int, default=3, help="Timed iterations of whole-archive drift analysis")
+    parser.add_argument("--collect-iterations", type=int, default=3, help="Timed iterations of collect_system_state (each takes over 1s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for parallel drift analysis")
+    parser.add_argument("--pollers", type=int, default=8, help="Concurrent API pollers")
+    parser.add_argument("--duration", type=float, default=10.0, help="API load test duration in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic snapshots")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run")
+    parser.add_argument("--output", "-o", help="Write results JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="Previous results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before a regression is reported (0.2 = 20%%)")
+    parser.add_argument("--ignore-param-mismatch", action="store_true",
+                        help="Compare against a baseline run with different parameters (warn instead of refusing)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.quick:
+        args.processes = min(args.processes, 1000)
+        args.archive_snapshots = min(args.archive_snapshots, 100)
+        args.archive_processes = min(args.archive_processes, 100)
+        args.iterations = min(args.iterations, 3)
+        args.collect_iterations = min(args.collect_iterations, 1)
+        args.duration = min(args.duration, 3.0)
+
+    selected = [name for name in (args.only or BENCHMARKS) if name not in args.skip]
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k not in UNCOMPARED_PARAMS}
+        },
+        "benchmarks": {},
+        "failures": {}
+    }
+
+    # Validate the baseline before spending minutes on benchmarks
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_baseline(args.baseline)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+
+        mismatches = param_mismatches(results, baseline)
+        for key, (previous, current) in mismatches.items():
+            print(f"Parameter mismatch: {key} was {previous!r} in baseline, now {current!r}", file=sys.stderr)
+        for key in ("cpu_count", "platform", "python"):
+            if baseline.get("meta", {}).get(key) != results["meta"][key]:
+                print(f"Warning: {key} differs from baseline", file=sys.stderr)
+        if mismatches and not args.ignore_param_mismatch:
+            print("Refusing to compare against a baseline run with different parameters "
+                  "(use --ignore-param-mismatch to compare anyway)", file=sys.stderr)
+            return 2
+
+    ctx = BenchContext(args)
+    try:
+        for name in selected:
+            print(f"Running {name} benchmarks...", file=sys.stderr)
+            try:
+                results["benchmarks"].update(BENCHMARKS[name](ctx))
+            except Exception as e:
+                print(f"Benchmark {name} failed: {e}", file=sys.stderr)
+                results["failures"][name] = str(e)
+    finally:
+        ctx.cleanup()
+
+    exit_code = 1 if results["failures"] else 0
+    if baseline is not None:
+        comparison = compare_results(results, baseline, args.threshold)
+        results["comparison"] = comparison
+        for row in comparison:
+            marker = "REGRESSION" if row["regression"] else ("ok" if row["gated"] else "ungated")
+            print(f"{row['name']:<45} {row['ratio']:>7.3f}x  {marker}", file=sys.stderr)
+        if any(row["regression"] for row in comparison):
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved: {args.output}", file=sys.stderr)
+    else:
+        json.dump(results, sys.stdout, indent=4)
+        sys.stdout.write("\n")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Synthetic snapshot generator.
+Produces snapshots in the same format as collector.snapshot, with realistic
+churn between consecutive snapshots: processes exit, new ones spawn, services
+restart under new PIDs and a few processes hog CPU or memory.
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+SERVICE_NAMES = [
+    "systemd", "sshd", "cron", "rsyslogd", "dbus-daemon", "nginx", "postgres",
+    "redis-server", "dockerd", "containerd", "containerd-shim", "python3", "node",
+    "java", "gunicorn", "uvicorn", "celery", "chrome", "bash", "zsh", "sudo",
+    "kworker", "ksoftirqd", "migration", "snapd", "NetworkManager", "polkitd",
+    "udisksd", "journald", "agetty", "prometheus", "grafana-server", "mysqld",
+    "php-fpm", "httpd", "memcached", "rabbitmq-server", "elasticsearch", "kubelet"
+]
+USERS = ["root", "www-data", "postgres", "redis", "ubuntu", "driftx", "nobody"]
+STATUSES = ["sleeping"] * 90 + ["running"] * 8 + ["idle", "zombie"]
+
+
+class SnapshotGenerator:
+    """
+    Generate a sequence of snapshots for a fleet of synthetic processes.
+
+    churn is the fraction of processes replaced between consecutive snapshots;
+    restart_ratio is the share of those that come back under the same name.
+    """
+
+    def __init__(self, process_count: int = 500, churn: float = 0.02,
+                 restart_ratio: float = 0.5, hog_ratio: float = 0.01, seed: int = 42):
+        self.process_count = process_count
+        self.churn = churn
+        self.restart_ratio = restart_ratio
+        self.hog_ratio = hog_ratio
+        self.rng = random.Random(seed)
+        self.next_pid = 1
+        self.processes = [self._spawn() for _ in range(process_count)]
+
+    def _new_pid(self) -> int:
+        self.next_pid += self.rng.randint(1, 7)
+        return self.next_pid
+
+    def _spawn(self, name: Optional[str] = None) -> Dict:
+        rng = self.rng
+        if name is None:
+            base = rng.choice(SERVICE_NAMES)
+            # Long tail of unique names so drift sees added/removed processes
+            name = base if rng.random() < 0.7 else f"{base}-{rng.randint(0, self.process_count)}"
+        hog = rng.random() < self.hog_ratio
+        return {
+            "pid": self._new_pid(),
+            "name": name,
+            "cpu_percent": rng.uniform(85, 100) if hog else rng.expovariate(2.0),
+            "memory_percent": rng.uniform(10, 30) if hog and rng.random() < 0.5 else rng.expovariate(5.0),
+            "status": rng.choice(STATUSES),
+            "user": rng.choice(USERS),
+            "command": f"/usr/bin/{name} --config /etc/{name}.conf --workers {rng.randint(1, 16)}",
+            "create_time": None,
+            "hog": hog
+        }
+
+    def _step(self):
+        rng = self.rng
+        replace = int(len(self.processes) * self.churn)
+        for i in rng.sample(range(len(self.processes)), replace):
+            name = self.processes[i]["name"] if rng.random() < self.restart_ratio else None
+            self.processes[i] = self._spawn(name)
+
+        for proc in self.processes:
+            if proc["hog"]:
+                proc["cpu_percent"] = min(100.0, max(60.0, proc["cpu_percent"] + rng.gauss(0, 5)))
+            else:
+                proc["cpu_percent"] = max(0.0, proc["cpu_percent"] + rng.gauss(0, 0.2))
+
+    @staticmethod
+    def _alert(status: str, cpu_pct: float, mem_pct: float) -> Optional[Dict]:
+        if status in ["zombie", "defunct"]:
+            return {"type": "zombie", "severity": "critical",
+                    "message": "Zombie/defunct process detected", "value": None, "threshold": None}
+        if cpu_pct > 50:
+            return {"type": "high_cpu", "severity": "critical" if cpu_pct > 80 else "warning",
+                    "message": f"Process using {cpu_pct:.1f}% CPU", "value": cpu_pct, "threshold": 50}
+        if mem_pct > 10:
+            return {"type": "high_memory", "severity": "critical" if mem_pct > 20 else "warning",
+                    "message": f"Process using {mem_pct:.1f}% memory", "value": mem_pct, "threshold": 10}
+        return None
+
+    def snapshot(self, timestamp: datetime) -> Dict:
+        """Build the snapshot for the current fleet state, then advance it."""
+        processes = []
+        for proc in self.processes:
+            cpu_pct = round(proc["cpu_percent"], 2)
+            mem_pct = round(proc["memory_percent"], 2)
+            processes.append({
+                "pid": proc["pid"],
+                "name": proc["name"],
+                "cpu_percent": cpu_pct,
+                "memory_percent": mem_pct,
+                "memory_mb": round(mem_pct * 160, 2),
+                "status": proc["status"],
+                "user": proc["user"],
+                "command": proc["command"][:200],
+                "create_time": proc["create_time"] or timestamp.isoformat(),
+                "alert": self._alert(proc["status"], cpu_pct, mem_pct)
+            })
+            if proc["create_time"] is None:
+                proc["create_time"] = timestamp.isoformat()
+
+        data = {
+            "timestamp": str(timestamp),
+            "cpu_percent": round(min(100.0, sum(p["cpu_percent"] for p in processes) / 8), 2),
+            "memory_percent": round(min(100.0, sum(p["memory_percent"] for p in processes)), 2),
+            "disk_usage": "Filesystem      Size  Used Avail Use% Mounted on\n/dev/sda1        100G   42G   58G  42% /",
+            "logged_users": "ubuntu   pts/0        2026-02-18 09:12 (10.0.0.5)",
+            "processes": processes
+        }
+        self._step()
+        return data
+
+
+def generate_snapshot(process_count: int = 10000, seed: int = 42) -> Dict:
+    """Generate a single snapshot with process_count processes."""
+    return SnapshotGenerator(process_count, seed=seed).snapshot(datetime.now())
+
+
+def generate_archive(snapshot_folder: str, snapshot_count: int = 10000, process_count: int = 500,
+                     churn: float = 0.02, interval_minutes: int = 5,
+                     start: Optional[datetime] = None, seed: int = 42, indent: Optional[int] = 4) -> List[str]:
+    """
+    Write snapshot_count consecutive snapshots to snapshot_folder using the
+    collector's file naming, and return their paths in order.
+    """
+    os.makedirs(snapshot_folder, exist_ok=True)
+    generator = SnapshotGenerator(process_count, churn=churn, seed=seed)
+    timestamp = start or datetime(2026, 1, 1)
+    paths = []
+
+    for _ in range(snapshot_count):
+        path = os.path.join(snapshot_folder, f"snapshot_{timestamp.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w") as f:
+            json.dump(generator.snapshot(timestamp), f, indent=indent)
+        paths.append(path)
+        timestamp += timedelta(minutes=interval_minutes)
+
+    return paths
@@ -1,9 +1,19 @@
 import os
+import sys
 import json
 import datetime
 import subprocess
 import psutil
 
+if __name__ == "__main__" and not __package__:
+    # Run as `python collector/snapshot.py`: make backend modules importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import (
+    COLLECT_DURATION, COLLECT_PROBE_DURATION, SNAPSHOT_SAVE_DURATION,
+    SNAPSHOT_CLEANUP_DURATION, SNAPSHOTS_REMOVED, SNAPSHOT_SIZE, SNAPSHOT_PROCESSES
+)
+
 SNAPSHOT_FOLDER = "./snapshots"
 
 os.makedirs(SNAPSHOT_FOLDER, exist_ok=True)
@@ -12,16 +22,25 @@ def run_command(cmd):
     result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
     return result.stdout.strip()
 
+@COLLECT_DURATION.time()
 def collect_system_state():
-    data = {
-        "timestamp": str(datetime.datetime.now()),
-        "cpu_percent": psutil.cpu_percent(interval=1),
-        "memory_percent": psutil.virtual_memory().percent,
-        "disk_usage": run_command("df -h"),
-        "logged_users": run_command("who"),
-        "processes": []
-    }
+    data = {"timestamp": str(datetime.datetime.now())}
+    with COLLECT_PROBE_DURATION.time(probe="cpu_percent"):
+        data["cpu_percent"] = psutil.cpu_percent(interval=1)
+    with COLLECT_PROBE_DURATION.time(probe="virtual_memory"):
+        data["memory_percent"] = psutil.virtual_memory().percent
+    with COLLECT_PROBE_DURATION.time(probe="disk_usage"):
+        data["disk_usage"] = run_command("df -h")
+    with COLLECT_PROBE_DURATION.time(probe="logged_users"):
+        data["logged_users"] = run_command("who")
+    data["processes"] = []
 
+    with COLLECT_PROBE_DURATION.time(probe="processes"):
+        collect_processes(data["processes"])
+
+    return data
+
+def collect_processes(processes):
     for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status', 'username', 'cmdline', 'create_time']):
         try:
             proc_info = proc.info
@@ -62,7 +81,7 @@ def collect_system_state():
             cmdline = proc_info.get('cmdline')
             command = ' '.join(cmdline) if cmdline else proc_info.get('name', '')
             
-            data["processes"].append({
+            processes.append({
                 "pid": proc_info['pid'],
                 "name": proc_info['name'],
                 "cpu_percent": round(cpu_pct, 2),
@@ -77,8 +96,7 @@ def collect_system_state():
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
             pass
 
-    return data
-
+@SNAPSHOT_SAVE_DURATION.time()
 def save_snapshot(data, max_snapshots=None):
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{SNAPSHOT_FOLDER}/snapshot_{timestamp}.json"
@@ -86,19 +104,23 @@ def save_snapshot(data, max_snapshots=None):
     with open(filename, "w") as f:
         json.dump(data, f, indent=4)
 
+    SNAPSHOT_SIZE.set(os.path.getsize(filename))
+    SNAPSHOT_PROCESSES.set(len(data.get("processes", [])))
     print(f"Snapshot saved: {filename}")
     
     # Clean up old snapshots if max_snapshots is specified
     if max_snapshots:
         try:
             import glob
-            snapshot_files = sorted(glob.glob(f"{SNAPSHOT_FOLDER}/snapshot_*.json"))
-            if len(snapshot_files) > max_snapshots:
-                # Remove oldest snapshots
-                files_to_remove = snapshot_files[:-max_snapshots]
-                for old_file in files_to_remove:
-                    os.remove(old_file)
-                    print(f"Removed old snapshot: {old_file}")
+            with SNAPSHOT_CLEANUP_DURATION.time():
+                snapshot_files = sorted(glob.glob(f"{SNAPSHOT_FOLDER}/snapshot_*.json"))
+                if len(snapshot_files) > max_snapshots:
+                    # Remove oldest snapshots
+                    files_to_remove = snapshot_files[:-max_snapshots]
+                    for old_file in files_to_remove:
+                        os.remove(old_file)
+                        SNAPSHOTS_REMOVED.inc()
+                        print(f"Removed old snapshot: {old_file}")
         except Exception as e:
             print(f"Error cleaning up old snapshots: {e}")
 
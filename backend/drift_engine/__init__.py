@@ -0,0 +1,4 @@
+"""
+Drift engine module for DriftX.
+Provides process drift detection between snapshots and offline churn analysis.
+"""
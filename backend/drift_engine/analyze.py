@@ -0,0 +1,407 @@
+"""
+Offline drift analysis over a snapshot archive.
+Diffs every adjacent pair of snapshots in a directory, .zip or .tar(.gz)
+archive across a process pool and builds a churn report: top churning
+process names, restart counts and a timeline of changes.
+
+Usage (from the backend directory):
+    python -m drift_engine.analyze ./snapshots --since 20260218_000000 --format csv
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import zipfile
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from drift_engine.compare import diff_process_index, index_processes
+
+SNAPSHOT_PREFIX = "snapshot_"
+SNAPSHOT_SUFFIX = ".json"
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def parse_snapshot_time(filename: str) -> Optional[datetime]:
+    """Parse the timestamp from a filename like snapshot_20260218_153245.json."""
+    name = os.path.basename(filename)
+    if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+        return None
+    try:
+        return datetime.strptime(name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)], TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def parse_time_arg(value: str) -> datetime:
+    """
+    Accept either the snapshot filename format or an ISO 8601 timestamp.
+    Snapshot times are naive local time, so timezone-aware values are
+    converted to local time.
+    """
+    for parse in (lambda v: datetime.strptime(v, TIMESTAMP_FORMAT), datetime.fromisoformat):
+        try:
+            parsed = parse(value)
+        except ValueError:
+            continue
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+    raise argparse.ArgumentTypeError(
+        f"invalid time '{value}', expected YYYYMMDD_HHMMSS or ISO 8601"
+    )
+
+
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"invalid value '{value}', expected a positive integer")
+    return number
+
+
+def extract_archive(archive_path: str, dest: str) -> str:
+    """
+    Extract snapshot files from a .zip or .tar(.gz) archive into dest.
+    Only snapshot_*.json members are extracted, flattened to their basename.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                name = os.path.basename(member.filename)
+                if member.is_dir() or parse_snapshot_time(name) is None:
+                    continue
+                with archive.open(member) as src, open(os.path.join(dest, name), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            for member in archive:
+                name = os.path.basename(member.name)
+                if not member.isfile() or parse_snapshot_time(name) is None:
+                    continue
+                src = archive.extractfile(member)
+                with src, open(os.path.join(dest, name), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+    else:
+        raise ValueError(f"Unsupported archive format: {archive_path}")
+    return dest
+
+
+def list_snapshots(snapshot_folder: str, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> List[str]:
+    """List snapshot paths in chronological order, limited to [since, until]."""
+    paths = []
+    for name in sorted(os.listdir(snapshot_folder)):
+        snapshot_time = parse_snapshot_time(name)
+        if snapshot_time is None:
+            continue
+        if since and snapshot_time < since:
+            continue
+        if until and snapshot_time > until:
+            continue
+        paths.append(os.path.join(snapshot_folder, name))
+    return paths
+
+
+def _load_index(path: str) -> Optional[Dict]:
+    """Index a snapshot's processes, or return None if it is unreadable or malformed."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict):
+        return None
+    processes = data.get("processes", [])
+    if not isinstance(processes, list) or not all(isinstance(proc, dict) for proc in processes):
+        return None
+    return index_processes(data)
+
+
+def diff_pair(previous_path: str, previous_index: Dict, path: str, index: Dict) -> Dict:
+    """Build the drift record for one adjacent pair of snapshots."""
+    snapshot_time = parse_snapshot_time(path)
+    return {
+        "previous": os.path.basename(previous_path),
+        "snapshot": os.path.basename(path),
+        "time": snapshot_time.isoformat() if snapshot_time else None,
+        **diff_process_index(previous_index, index)
+    }
+
+
+def diff_chunk(paths: List[str]) -> Dict:
+    """
+    Diff each adjacent pair in a run of consecutive snapshots.
+    Runs in a worker process; every snapshot in the run is parsed only once.
+    Unreadable snapshots are skipped and reported back, along with the first
+    and last readable snapshot so the parent can bridge chunk boundaries.
+    """
+    pairs = []
+    skipped = []
+    first_path = None
+    previous_path = None
+    previous_index = None
+
+    for path in paths:
+        current_index = _load_index(path)
+        if current_index is None:
+            skipped.append(os.path.basename(path))
+            continue
+
+        if previous_index is None:
+            first_path = path
+        else:
+            pairs.append(diff_pair(previous_path, previous_index, path, current_index))
+
+        previous_path = path
+        previous_index = current_index
+
+    return {
+        "pairs": pairs,
+        "skipped": skipped,
+        "first": first_path,
+        "last": previous_path
+    }
+
+
+def chunk_paths(paths: List[str], chunk_size: int) -> List[List[str]]:
+    """
+    Split paths into runs that overlap by one snapshot. If the shared snapshot
+    is unreadable, iter_pair_diffs diffs across the gap.
+    """
+    return [paths[i:i + chunk_size + 1] for i in range(0, max(len(paths) - 1, 0), chunk_size)]
+
+
+def _chunk_results(chunks: List[List[str]], workers: int) -> Iterator[Dict]:
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield diff_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(diff_chunk, chunks)
+
+
+def iter_pair_diffs(paths: List[str], workers: int = 1,
+                    chunk_size: Optional[int] = None) -> Iterator[Tuple[List[Dict], List[str]]]:
+    """
+    Yield (pairs, skipped) per chunk, in chronological order, as chunks finish.
+    With more than one worker the chunks are fanned out across a process pool.
+    When the snapshot shared by two chunks is unreadable, the pair across the
+    gap is diffed here so results match a serial run.
+    """
+    pair_count = max(len(paths) - 1, 0)
+    if chunk_size is None:
+        chunk_size = max(1, min(256, math.ceil(pair_count / (workers * 4)))) if pair_count else 1
+    chunks = chunk_paths(paths, chunk_size)
+
+    last_path = None
+    for result in _chunk_results(chunks, workers):
+        pairs = result["pairs"]
+        if last_path and result["first"] and result["first"] != last_path:
+            pairs = [diff_pair(last_path, _load_index(last_path),
+                               result["first"], _load_index(result["first"]))] + pairs
+        if result["last"]:
+            last_path = result["last"]
+        yield pairs, result["skipped"]
+
+
+class ChurnReport:
+    """Accumulate pair diffs into churn statistics and a change timeline."""
+
+    def __init__(self, top: int = 20):
+        self.top = top
+        self.snapshot_count = 0
+        self.pair_count = 0
+        self.first_snapshot = None
+        self.last_snapshot = None
+        self.added = Counter()
+        self.removed = Counter()
+        self.restarts = Counter()
+        self.timeline = []
+        self.skipped = []
+
+    def add(self, pair: Dict):
+        self.pair_count += 1
+        if self.first_snapshot is None:
+            self.first_snapshot = pair["previous"]
+        self.last_snapshot = pair["snapshot"]
+
+        self.added.update(pair["added"])
+        self.removed.update(pair["removed"])
+        self.restarts.update(pair["restarted"])
+
+        if pair["added"] or pair["removed"] or pair["restarted"]:
+            self.timeline.append({
+                "snapshot": pair["snapshot"],
+                "time": pair["time"],
+                "added": pair["added"],
+                "removed": pair["removed"],
+                "restarted": pair["restarted"]
+            })
+
+    def churn_table(self) -> List[Dict]:
+        """Per process name churn, highest churn first."""
+        names = set(self.added) | set(self.removed) | set(self.restarts)
+        rows = [
+            {
+                "name": name,
+                "added": self.added[name],
+                "removed": self.removed[name],
+                "restarts": self.restarts[name],
+                "churn": self.added[name] + self.removed[name] + self.restarts[name]
+            }
+            for name in names
+        ]
+        rows.sort(key=lambda row: (-row["churn"], row["name"]))
+        return rows
+
+    def summary(self) -> Dict:
+        return {
+            "snapshots": self.snapshot_count,
+            "pairs": self.pair_count,
+            "first_snapshot": self.first_snapshot,
+            "last_snapshot": self.last_snapshot,
+            "skipped_snapshots": self.skipped,
+            "total_added": sum(self.added.values()),
+            "total_removed": sum(self.removed.values()),
+            "total_restarts": sum(self.restarts.values()),
+            "top_churners": self.churn_table()[:self.top],
+            "restart_counts": dict(sorted(self.restarts.items(), key=lambda item: (-item[1], item[0])))
+        }
+
+    def to_dict(self) -> Dict:
+        report = self.summary()
+        report["timeline"] = self.timeline
+        return report
+
+
+def analyze(snapshot_folder: str, since: Optional[datetime] = None,
+            until: Optional[datetime] = None, workers: int = 1,
+            chunk_size: Optional[int] = None, top: int = 20,
+            on_pair=None) -> ChurnReport:
+    """
+    Build a churn report for the snapshots in snapshot_folder.
+    on_pair, if given, is called with each pair diff as soon as it is available.
+    """
+    paths = list_snapshots(snapshot_folder, since, until)
+    report = ChurnReport(top=top)
+
+    for pairs, skipped in iter_pair_diffs(paths, workers, chunk_size):
+        report.skipped.extend(name for name in skipped if name not in report.skipped)
+        for pair in pairs:
+            report.add(pair)
+            if on_pair:
+                on_pair(pair)
+
+    report.snapshot_count = len(paths) - len(report.skipped)
+    return report
+
+
+def write_csv(report: ChurnReport, out):
+    writer = csv.DictWriter(out, fieldnames=["name", "added", "removed", "restarts", "churn"])
+    writer.writeheader()
+    writer.writerows(report.churn_table())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m drift_engine.analyze",
+        description="Analyze process drift and churn across a snapshot archive."
+    )
+    parser.add_argument("source", help="Snapshot directory or .zip/.tar/.tar.gz archive")
+    parser.add_argument("--since", type=parse_time_arg,
+                        help="Only include snapshots at or after this time (YYYYMMDD_HHMMSS or ISO 8601)")
+    parser.add_argument("--until", type=parse_time_arg,
+                        help="Only include snapshots at or before this time (YYYYMMDD_HHMMSS or ISO 8601)")
+    parser.add_argument("--format", choices=["json", "csv", "jsonl"], default="json",
+                        help="json: full report; csv: churn table; jsonl: stream each pair diff, then the summary")
+    parser.add_argument("--output", "-o", help="Write the report to this file instead of stdout")
+    parser.add_argument("--workers", "-j", type=positive_int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=positive_int,
+                        help="Snapshot pairs per worker task (default: chosen from archive size)")
+    parser.add_argument("--top", type=positive_int, default=20, help="Number of top churners to report")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if not os.path.exists(args.source):
+        print(f"Snapshot source not found: {args.source}", file=sys.stderr)
+        return 1
+    if args.output and not os.path.isdir(os.path.dirname(os.path.abspath(args.output))):
+        print(f"Error: output directory not found: {os.path.dirname(os.path.abspath(args.output))}", file=sys.stderr)
+        return 1
+
+    temp_dir = None
+    out = sys.stdout
+    try:
+        snapshot_folder = args.source
+        if not os.path.isdir(args.source):
+            temp_dir = tempfile.mkdtemp(prefix="driftx-analyze-")
+            snapshot_folder = extract_archive(args.source, temp_dir)
+
+        # Write to a temporary file next to --output and only replace it on
+        # success, so a failed run never leaves a truncated report behind
+        if args.output:
+            out = tempfile.NamedTemporaryFile(
+                "w", newline="", delete=False,
+                dir=os.path.dirname(os.path.abspath(args.output)),
+                prefix=".driftx-analyze-"
+            )
+
+        on_pair = None
+        if args.format == "jsonl":
+            def on_pair(pair):
+                out.write(json.dumps(pair) + "\n")
+                out.flush()
+
+        report = analyze(
+            snapshot_folder,
+            since=args.since,
+            until=args.until,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            top=args.top,
+            on_pair=on_pair
+        )
+
+        if args.format == "json":
+            json.dump(report.to_dict(), out, indent=4)
+            out.write("\n")
+        elif args.format == "csv":
+            write_csv(report, out)
+        else:
+            out.write(json.dumps({"summary": report.summary()}) + "\n")
+
+        if args.output:
+            out.close()
+            os.replace(out.name, args.output)
+    except (ValueError, OSError, EOFError, tarfile.TarError, zipfile.BadZipFile, zlib.error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout and not out.closed:
+            out.close()
+            os.remove(out.name)
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,8 @@ import os
 
 SNAPSHOT_FOLDER = "../snapshots"
 
-def load_snapshots():
-    files = sorted(os.listdir(SNAPSHOT_FOLDER))
+def load_snapshots(snapshot_folder=SNAPSHOT_FOLDER):
+    files = sorted(os.listdir(snapshot_folder))
 
     if len(files) < 2:
         print("Need at least 2 snapshots")
@@ -13,25 +13,58 @@ def load_snapshots():
     old_file = files[-2]
     new_file = files[-1]
 
-    with open(f"{SNAPSHOT_FOLDER}/{old_file}") as f:
+    with open(f"{snapshot_folder}/{old_file}") as f:
         old_data = json.load(f)
 
-    with open(f"{SNAPSHOT_FOLDER}/{new_file}") as f:
+    with open(f"{snapshot_folder}/{new_file}") as f:
         new_data = json.load(f)
 
     return old_data, new_data
 
 
-def detect_drift(old, new):
-    old_processes = {p["name"] for p in old["processes"]}
-    new_processes = {p["name"] for p in new["processes"]}
+def index_processes(snapshot):
+    """Map each process name in a snapshot to the set of PIDs running under it."""
+    index = {}
+    for proc in snapshot.get("processes", []):
+        index.setdefault(proc.get("name"), set()).add(proc.get("pid"))
+    return index
+
+
+def diff_process_index(old_index, new_index):
+    """
+    Compare two name -> PIDs indexes.
+    A name whose PIDs were replaced between snapshots counts as a restart.
+    """
+    added = sorted(name for name in new_index.keys() - old_index.keys() if name is not None)
+    removed = sorted(name for name in old_index.keys() - new_index.keys() if name is not None)
+
+    restarted = {}
+    for name in sorted(n for n in old_index.keys() & new_index.keys() if n is not None):
+        old_pids = old_index[name]
+        new_pids = new_index[name]
+        if old_pids != new_pids:
+            count = min(len(old_pids - new_pids), len(new_pids - old_pids))
+            if count:
+                restarted[name] = count
+
+    return {
+        "added": added,
+        "removed": removed,
+        "restarted": restarted
+    }
 
-    added = new_processes - old_processes
-    removed = old_processes - new_processes
+
+def diff_snapshots(old, new):
+    """Compare the processes of two snapshots."""
+    return diff_process_index(index_processes(old), index_processes(new))
+
+
+def detect_drift(old, new):
+    drift = diff_snapshots(old, new)
 
     print("\n=== DRIFT DETECTION RESULT ===")
-    print("Added Processes:", added)
-    print("Removed Processes:", removed)
+    print("Added Processes:", set(drift["added"]))
+    print("Removed Processes:", set(drift["removed"]))
 
 
 if __name__ == "__main__":
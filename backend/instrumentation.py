@@ -0,0 +1,324 @@
+"""
+Instrumentation for DriftX.
+Provides low-overhead counters, gauges and histograms rendered in OpenMetrics
+text format, plus an opt-in sampling profiler that reports hot stacks.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route template of the request being served, used to label JSON parse timings
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="background")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class for metrics keyed by a fixed set of label names."""
+
+    metric_type = "unknown"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# TYPE {self.name} {self.metric_type}",
+            f"# HELP {self.name} {_escape(self.documentation)}"
+        ]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, exposed with a _total suffix."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self, items) -> List[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. the size of the latest snapshot."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class _Timer(ContextDecorator):
+    """Observe elapsed wall time into a histogram; usable as a decorator or with-block."""
+
+    def __init__(self, histogram: "Histogram", labels: Dict):
+        self.histogram = histogram
+        self.labels = labels
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._local.start, **self.labels)
+        return False
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+                    break
+            state["count"] += 1
+            state["sum"] += value
+
+    def time(self, **labels) -> _Timer:
+        return _Timer(self, labels)
+
+    def _render_samples(self, items) -> List[str]:
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["buckets"]):
+                cumulative += count
+                le = f'le="{_format_value(bound) if bound == float("inf") else repr(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+            lines.append(f"{self.name}_sum{labels} {repr(float(state['sum']))}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together on the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Collector
+COLLECT_DURATION = Histogram(
+    "driftx_collect_duration_seconds",
+    "Time spent in collect_system_state",
+    buckets=(0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+)
+COLLECT_PROBE_DURATION = Histogram(
+    "driftx_collect_probe_duration_seconds",
+    "Time spent in each probe of collect_system_state",
+    ["probe"]
+)
+
+# Storage
+SNAPSHOT_SAVE_DURATION = Histogram(
+    "driftx_snapshot_save_duration_seconds",
+    "Time spent in save_snapshot, including cleanup"
+)
+SNAPSHOT_CLEANUP_DURATION = Histogram(
+    "driftx_snapshot_cleanup_duration_seconds",
+    "Time spent removing old snapshots"
+)
+SNAPSHOTS_REMOVED = Counter(
+    "driftx_snapshots_removed",
+    "Old snapshots removed by cleanup"
+)
+SNAPSHOT_SIZE = Gauge(
+    "driftx_snapshot_size_bytes",
+    "Size of the most recently saved snapshot"
+)
+SNAPSHOT_PROCESSES = Gauge(
+    "driftx_snapshot_processes",
+    "Number of processes in the most recently saved snapshot"
+)
+SNAPSHOTS_CREATED = Counter(
+    "driftx_snapshots_created",
+    "Snapshot creation attempts by outcome",
+    ["outcome"]
+)
+
+# Analysis and API
+PROCESS_MONITOR_DURATION = Histogram(
+    "driftx_process_monitor_duration_seconds",
+    "Time spent in ProcessMonitor methods",
+    ["method"]
+)
+JSON_PARSE_DURATION = Histogram(
+    "driftx_json_parse_duration_seconds",
+    "Time spent parsing snapshot JSON, by endpoint",
+    ["endpoint"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "driftx_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"]
+)
+HTTP_REQUESTS = Counter(
+    "driftx_http_requests",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"]
+)
+
+# Scheduler
+SCHEDULER_LAG = Histogram(
+    "driftx_scheduler_lag_seconds",
+    "Delay between a job's scheduled run time and its submission",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0)
+)
+SCHEDULER_JOBS = Counter(
+    "driftx_scheduler_jobs",
+    "Scheduler job events by outcome",
+    ["outcome"]
+)
+
+
+def load_json(f):
+    """json.load, timed against the endpoint currently being served."""
+    with JSON_PARSE_DURATION.time(endpoint=current_endpoint.get()):
+        return json.load(f)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the stacks of all other threads.
+    Only one profile can run at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _frame_stack(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def profile(self, duration: float, interval: float = 0.005, top: int = 50) -> Dict:
+        """
+        Sample every thread for duration seconds and return the hottest stacks.
+        Stacks are in collapsed (root;...;leaf) form, ready for flame graph tools.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            stacks = StackCounter()
+            samples = 0
+            deadline = time.perf_counter() + duration
+
+            while time.perf_counter() < deadline:
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    thread_name = thread_names.get(thread_id, str(thread_id))
+                    stacks[f"{thread_name};{self._frame_stack(frame)}"] += 1
+                samples += 1
+                time.sleep(interval)
+
+            total = sum(stacks.values()) or 1
+            return {
+                "duration_seconds": duration,
+                "interval_seconds": interval,
+                "samples": samples,
+                "stacks": [
+                    {"stack": stack, "count": count, "percent": round(count * 100 / total, 2)}
+                    for stack, count in stacks.most_common(top)
+                ]
+            }
+        finally:
+            self._lock.release()
+
+
+profiler = SamplingProfiler()
@@ -1,12 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Match
 from contextlib import asynccontextmanager
-import json
+import ipaddress
 import os
+import time
 from datetime import datetime, timezone
 from analyzer.process_monitor import ProcessMonitor
+from drift_engine.compare import diff_snapshots
 from scheduler import init_scheduler, shutdown_scheduler, get_scheduler_info, create_snapshot
+from instrumentation import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, HTTP_REQUEST_DURATION, HTTP_REQUESTS,
+    current_endpoint, load_json, profiler
+)
 
 
 @asynccontextmanager
@@ -28,6 +35,31 @@ app.add_middleware(
 )
 
 
+def route_template(request: Request) -> str:
+    """Resolve the route path template (e.g. /process-details/{pid}) for metric labels."""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    route = route_template(request)
+    token = current_endpoint.set(route)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method, route=route)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=str(status))
+        current_endpoint.reset(token)
+
+
 # Helper to create JSON responses with no-cache headers
 def json_response(data, status_code=200):
     return JSONResponse(
@@ -43,6 +75,24 @@ def json_response(data, status_code=200):
 SNAPSHOT_FOLDER = "./snapshots"
 monitor = ProcessMonitor(SNAPSHOT_FOLDER)
 
+# Opt-in sampling profiler (read after scheduler import has loaded .env)
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILER_MAX_SECONDS = 60
+
+
+def require_local_caller(request: Request):
+    """
+    Allow only direct loopback callers. nginx also connects from loopback, so
+    proxied requests are recognised by the forwarding headers it sets.
+    """
+    host = request.client.host if request.client else None
+    try:
+        local = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        local = False
+    if not local or "x-forwarded-for" in request.headers or "x-real-ip" in request.headers:
+        raise HTTPException(status_code=403, detail="Only available to local callers")
+
 
 @app.get("/")
 def home():
@@ -59,7 +109,7 @@ def latest_snapshot():
     latest = files[-1]
 
     with open(f"{SNAPSHOT_FOLDER}/{latest}") as f:
-        data = json.load(f)
+        data = load_json(f)
 
     return json_response(data)
 
@@ -75,17 +125,16 @@ def drift_result():
     new_file = files[-1]
 
     with open(f"{SNAPSHOT_FOLDER}/{old_file}") as f:
-        old_data = json.load(f)
+        old_data = load_json(f)
 
     with open(f"{SNAPSHOT_FOLDER}/{new_file}") as f:
-        new_data = json.load(f)
+        new_data = load_json(f)
 
-    old_proc = {p["name"] for p in old_data["processes"]}
-    new_proc = {p["name"] for p in new_data["processes"]}
+    drift = diff_snapshots(old_data, new_data)
 
     return json_response({
-        "added": list(new_proc - old_proc),
-        "removed": list(old_proc - new_proc)
+        "added": drift["added"],
+        "removed": drift["removed"]
     })
 @app.get("/timeline")
 def timeline():
@@ -255,3 +304,32 @@ def scheduler_status():
     """Get scheduler status and configuration."""
     return json_response(get_scheduler_info())
 
+
+@app.get("/metrics", dependencies=[Depends(require_local_caller)])
+def metrics():
+    """Export DriftX instrumentation in OpenMetrics text format."""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/debug/profile", dependencies=[Depends(require_local_caller)])
+def debug_profile(seconds: float = 5.0, top: int = 50, format: str = "json"):
+    """
+    Sample all threads for the given duration and return the hottest stacks.
+    Disabled unless PROFILER_ENABLED=true. format=folded returns collapsed
+    stacks suitable for flame graph tools.
+    """
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiler is disabled (set PROFILER_ENABLED=true)")
+    if not 0 < seconds <= PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {PROFILER_MAX_SECONDS}")
+    if format not in ("json", "folded"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'folded'")
+
+    try:
+        result = profiler.profile(seconds, top=top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "folded":
+        return PlainTextResponse("".join(f"{s['stack']} {s['count']}\n" for s in result["stacks"]))
+    return json_response(result)
@@ -2,11 +2,13 @@ import os
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 # Import the snapshot collector
 from collector.snapshot import collect_system_state, save_snapshot
+from instrumentation import SCHEDULER_LAG, SCHEDULER_JOBS, SNAPSHOTS_CREATED
 
 # Load environment variables
 load_dotenv()
@@ -32,12 +34,28 @@ def create_snapshot():
         system_state = collect_system_state()
         save_snapshot(system_state, max_snapshots=MAX_SNAPSHOTS)
         logger.info("Scheduled snapshot created successfully")
+        SNAPSHOTS_CREATED.inc(outcome="success")
         return True
     except Exception as e:
         logger.error(f"Error creating snapshot: {e}")
+        SNAPSHOTS_CREATED.inc(outcome="failure")
         return False
 
 
+def record_job_event(event):
+    """Record scheduler lag and job outcomes for the metrics endpoint."""
+    if event.code == EVENT_JOB_SUBMITTED:
+        if event.scheduled_run_times:
+            lag = datetime.now(timezone.utc) - event.scheduled_run_times[-1]
+            SCHEDULER_LAG.observe(max(lag.total_seconds(), 0.0))
+    elif event.code == EVENT_JOB_EXECUTED:
+        SCHEDULER_JOBS.inc(outcome="executed")
+    elif event.code == EVENT_JOB_ERROR:
+        SCHEDULER_JOBS.inc(outcome="error")
+    elif event.code == EVENT_JOB_MISSED:
+        SCHEDULER_JOBS.inc(outcome="missed")
+
+
 def init_scheduler():
     """Initialize and start the scheduler."""
     global scheduler
@@ -47,6 +65,10 @@ def init_scheduler():
         return scheduler
     
     scheduler = BackgroundScheduler(timezone=TIMEZONE)
+    scheduler.add_listener(
+        record_job_event,
+        EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+    )
     
     if AUTO_SNAPSHOT_ENABLED:
         # Add job to create snapshots at regular intervals
@@ -0,0 +1,156 @@
+import json
+import os
+import tarfile
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from drift_engine.analyze import analyze, extract_archive, list_snapshots, main, parse_time_arg
+from drift_engine.compare import diff_process_index, diff_snapshots
+
+START = datetime(2026, 1, 1)
+
+
+def write_snapshots(folder, count, corrupt=()):
+    """
+    Write count snapshots five minutes apart, with some process churn.
+    corrupt is a collection of indexes to write as invalid JSON, or a mapping
+    of index to the raw content to write instead.
+    """
+    if not isinstance(corrupt, dict):
+        corrupt = {i: "{bad" for i in corrupt}
+    folder.mkdir(exist_ok=True)
+    paths = []
+    for i in range(count):
+        processes = [{"pid": 100 + n, "name": f"svc{n}"} for n in range(5)]
+        processes.append({"pid": 1000 + i, "name": "worker"})  # restarts every snapshot
+        if i % 3 == 0:
+            processes.append({"pid": 2000 + i, "name": f"job{i}"})  # appears and goes away
+        timestamp = START + timedelta(minutes=5 * i)
+        path = folder / f"snapshot_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+        path.write_text(corrupt[i] if i in corrupt else json.dumps({"processes": processes}))
+        paths.append(path)
+    return paths
+
+
+def test_diff_process_index_counts_restarts():
+    old = {"nginx": {1, 2}, "cron": {3}, "gone": {4}}
+    new = {"nginx": {1, 5}, "cron": {3}, "new": {6}}
+
+    drift = diff_process_index(old, new)
+
+    assert drift == {"added": ["new"], "removed": ["gone"], "restarted": {"nginx": 1}}
+
+
+def test_diff_snapshots_ignores_extra_instances():
+    old = {"processes": [{"pid": 1, "name": "python3"}]}
+    new = {"processes": [{"pid": 1, "name": "python3"}, {"pid": 2, "name": "python3"}]}
+
+    assert diff_snapshots(old, new)["restarted"] == {}
+
+
+def test_list_snapshots_filters_time_range(tmp_path):
+    paths = write_snapshots(tmp_path / "snaps", 6)
+    (tmp_path / "snaps" / "notes.txt").write_text("ignored")
+
+    selected = list_snapshots(str(tmp_path / "snaps"),
+                              since=START + timedelta(minutes=5),
+                              until=START + timedelta(minutes=15))
+
+    assert selected == [str(p) for p in paths[1:4]]
+
+
+def test_parse_time_arg_converts_aware_times_to_local():
+    aware = datetime(2026, 1, 1, 0, 5, tzinfo=timezone.utc)
+
+    assert parse_time_arg(aware.isoformat()) == aware.astimezone().replace(tzinfo=None)
+    assert parse_time_arg("20260101_000500") == datetime(2026, 1, 1, 0, 5)
+
+
+@pytest.mark.parametrize("kind", ["zip", "tar"])
+def test_extract_archive_keeps_only_snapshots(tmp_path, kind):
+    paths = write_snapshots(tmp_path / "snaps", 3)
+    archive = tmp_path / f"snaps.{kind}"
+    if kind == "zip":
+        with zipfile.ZipFile(archive, "w") as zf:
+            for path in paths:
+                zf.write(path, f"nested/{path.name}")
+            zf.writestr("../evil.txt", "x")
+    else:
+        with tarfile.open(archive, "w:gz") as tf:
+            for path in paths:
+                tf.add(path, f"nested/{path.name}")
+    dest = tmp_path / "out"
+    dest.mkdir()
+
+    extract_archive(str(archive), str(dest))
+
+    assert sorted(os.listdir(dest)) == [path.name for path in paths]
+
+
+def test_analyze_counts_churn(tmp_path):
+    write_snapshots(tmp_path / "snaps", 4)
+
+    report = analyze(str(tmp_path / "snaps")).to_dict()
+
+    assert report["pairs"] == 3
+    assert report["restart_counts"] == {"worker": 3}
+    assert report["timeline"][0]["removed"] == ["job0"]
+
+
+@pytest.mark.parametrize("corrupt", [
+    (), (5,), (5, 10), (4, 5, 6), (0,), (39,),
+    {5: "null"}, {5: "[]"}, {10: '{"processes": null}'}, {10: '{"processes": [1, 2]}'}, {15: "42"},
+])
+def test_parallel_matches_serial_with_corrupt_snapshots(tmp_path, corrupt):
+    write_snapshots(tmp_path / "snaps", 40, corrupt=corrupt)
+    folder = str(tmp_path / "snaps")
+
+    serial = analyze(folder, workers=1).to_dict()
+    parallel = analyze(folder, workers=4, chunk_size=5).to_dict()
+
+    assert parallel == serial
+    assert serial["pairs"] == 39 - len(corrupt)
+
+
+def test_main_leaves_no_output_on_bad_archive(tmp_path, capsys):
+    source = tmp_path / "not-an-archive.txt"
+    source.write_text("hello")
+    output = tmp_path / "out.csv"
+
+    assert main([str(source), "--format", "csv", "-o", str(output)]) == 1
+    assert not output.exists()
+    assert os.listdir(tmp_path) == [source.name]
+
+
+def test_main_reports_truncated_archive(tmp_path, capsys):
+    paths = write_snapshots(tmp_path / "snaps", 20)
+    archive = tmp_path / "snaps.tar.gz"
+    with tarfile.open(archive, "w:gz") as tf:
+        for path in paths:
+            tf.add(path, path.name)
+    archive.write_bytes(archive.read_bytes()[:-200])
+
+    assert main([str(archive)]) == 1
+    assert capsys.readouterr().err.startswith("Error: ")
+
+
+def test_main_reports_missing_output_directory(tmp_path, capsys):
+    write_snapshots(tmp_path / "snaps", 3)
+
+    assert main([str(tmp_path / "snaps"), "-o", str(tmp_path / "missing" / "out.json")]) == 1
+    assert capsys.readouterr().err.startswith("Error: ")
+
+
+def test_main_rejects_non_positive_chunk_size(tmp_path):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), "--chunk-size", "0"])
+
+
+def test_main_writes_csv(tmp_path):
+    write_snapshots(tmp_path / "snaps", 4)
+    output = tmp_path / "churn.csv"
+
+    assert main([str(tmp_path / "snaps"), "--format", "csv", "-o", str(output), "-j", "1"]) == 0
+    assert output.read_text().splitlines()[:2] == ["name,added,removed,restarts,churn", "worker,0,0,3,3"]
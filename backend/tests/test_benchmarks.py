@@ -0,0 +1,32 @@
+from benchmarks.run import compare_results, param_mismatches, percentile
+
+
+def run(params, **benchmarks):
+    return {"meta": {"params": params}, "benchmarks": benchmarks}
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(20, 0, -1))
+
+    assert percentile(values, 95) == 19
+    assert percentile(values, 100) == 20
+    assert percentile([1, 2, 3], 50) == 2
+    assert percentile([7], 95) == 7
+
+
+def test_param_mismatches_ignores_selection_flags():
+    baseline = run({"processes": 1000, "quick": True, "only": ["drift"], "threshold": 0.2})
+    current = run({"processes": 10000, "quick": False, "only": None, "threshold": 0.5})
+
+    assert param_mismatches(current, baseline) == {"processes": (1000, 10000), "quick": (True, False)}
+
+
+def test_compare_only_gates_on_enough_samples():
+    baseline = run({}, fast={"iterations": 5, "median_seconds": 1.0}, noisy={"iterations": 1, "median_seconds": 1.0})
+    current = run({}, fast={"iterations": 5, "median_seconds": 1.5}, noisy={"iterations": 1, "median_seconds": 3.0})
+
+    rows = {row["name"]: row for row in compare_results(current, baseline, threshold=0.2)}
+
+    assert rows["fast"]["regression"] is True
+    assert rows["noisy"]["gated"] is False
+    assert rows["noisy"]["regression"] is False
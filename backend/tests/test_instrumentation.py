@@ -0,0 +1,128 @@
+import io
+import threading
+
+import pytest
+
+from instrumentation import (
+    JSON_PARSE_DURATION, Counter, Gauge, Histogram, Registry, SamplingProfiler, current_endpoint, load_json
+)
+
+
+@pytest.fixture
+def registry():
+    registry = Registry()
+    requests = Counter("test_requests", "Requests served", ["route", "status"], registry=registry)
+    requests.inc(route="/", status="200")
+    requests.inc(2, route='/a"b\\c\nd', status="500")
+    Gauge("test_size_bytes", "Size of the latest snapshot", registry=registry).set(1234)
+    latency = Histogram("test_latency_seconds", "Request latency", ["route"], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, route="/")
+    return registry
+
+
+def test_render_format(registry):
+    text = registry.render()
+    lines = text.splitlines()
+
+    assert text.endswith("# EOF\n")
+    assert "# TYPE test_requests counter" in lines
+    assert 'test_requests_total{route="/",status="200"} 1' in lines
+    assert 'test_requests_total{route="/a\\"b\\\\c\\nd",status="500"} 2' in lines
+    assert "test_size_bytes 1234" in lines
+    assert 'test_latency_seconds_bucket{route="/",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{route="/"} 3' in lines
+    assert 'test_latency_seconds_sum{route="/"} 5.55' in lines
+
+
+def test_render_parses_as_openmetrics(registry):
+    parser = pytest.importorskip("prometheus_client.openmetrics.parser")
+
+    families = {family.name: family for family in parser.text_string_to_metric_families(registry.render())}
+
+    assert families["test_requests"].type == "counter"
+    samples = {(s.name, tuple(sorted(s.labels.items()))): s.value for s in families["test_requests"].samples}
+    assert samples[("test_requests_total", (("route", '/a"b\\c\nd'), ("status", "500")))] == 2
+    assert families["test_size_bytes"].type == "gauge"
+    histogram = {(s.name, s.labels.get("le")): s.value for s in families["test_latency_seconds"].samples}
+    assert histogram[("test_latency_seconds_bucket", "+Inf")] == 3
+    assert histogram[("test_latency_seconds_count", None)] == 3
+
+
+def test_labels_must_match():
+    counter = Counter("test_strict", "Strict labels", ["route"], registry=Registry())
+
+    with pytest.raises(ValueError):
+        counter.inc(path="/")
+
+
+def test_duplicate_metric_names_rejected():
+    registry = Registry()
+    Gauge("test_dup", "First", registry=registry)
+
+    with pytest.raises(ValueError):
+        Gauge("test_dup", "Second", registry=registry)
+
+
+def test_timer_as_decorator_and_context_manager():
+    registry = Registry()
+    histogram = Histogram("test_timer_seconds", "Timed", ["kind"], registry=registry)
+
+    @histogram.time(kind="decorator")
+    def work():
+        return 42
+
+    assert work() == 42
+    with histogram.time(kind="block"):
+        pass
+
+    text = registry.render()
+    assert 'test_timer_seconds_count{kind="decorator"} 1' in text
+    assert 'test_timer_seconds_count{kind="block"} 1' in text
+
+
+def test_load_json_labels_current_endpoint():
+    token = current_endpoint.set("/test-endpoint")
+    try:
+        assert load_json(io.StringIO('{"a": 1}')) == {"a": 1}
+    finally:
+        current_endpoint.reset(token)
+
+    assert 'driftx_json_parse_duration_seconds_count{endpoint="/test-endpoint"} 1' in "\n".join(JSON_PARSE_DURATION.render())
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_reports_busy_thread():
+    profiler = SamplingProfiler()
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    thread.start()
+    try:
+        result = profiler.profile(0.2, interval=0.005, top=5)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert result["samples"] > 0
+    assert len(result["stacks"]) <= 5
+    assert any(s["stack"].startswith("busy-worker;") and s["stack"].split(";")[-1].startswith("test_instrumentation.py:busy_loop")
+               for s in result["stacks"])
+
+
+def test_profiler_allows_one_profile_at_a_time():
+    profiler = SamplingProfiler()
+    # Hold the lock as a running profile would, so the check is deterministic
+    profiler._lock.acquire()
+    try:
+        with pytest.raises(RuntimeError):
+            profiler.profile(0.01)
+    finally:
+        profiler._lock.release()
+
+    assert profiler.profile(0.01)["samples"] > 0
@@ -0,0 +1,34 @@
+import pytest
+
+for module in ("fastapi", "psutil", "apscheduler", "dotenv"):
+    pytest.importorskip(module)
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import main
+
+
+def make_request(host, headers=()):
+    return Request({
+        "type": "http",
+        "client": (host, 40000),
+        "headers": [(name.encode(), value.encode()) for name, value in headers]
+    })
+
+
+@pytest.mark.parametrize("host", ["127.0.0.1", "::1"])
+def test_local_caller_allowed(host):
+    main.require_local_caller(make_request(host))
+
+
+@pytest.mark.parametrize("host, headers", [
+    ("10.0.0.5", ()),
+    ("testclient", ()),
+    ("127.0.0.1", [("x-forwarded-for", "203.0.113.7")]),
+    ("127.0.0.1", [("x-real-ip", "203.0.113.7")]),
+])
+def test_remote_or_proxied_caller_rejected(host, headers):
+    with pytest.raises(HTTPException) as exc:
+        main.require_local_caller(make_request(host, headers))
+    assert exc.value.status_code == 403
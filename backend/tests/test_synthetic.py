@@ -0,0 +1,53 @@
+import json
+import os
+import re
+from datetime import datetime
+
+from benchmarks.synthetic import SnapshotGenerator, generate_archive
+from drift_engine.analyze import analyze, parse_snapshot_time
+
+# Keys written by collector.snapshot.collect_system_state
+SNAPSHOT_KEYS = {"timestamp", "cpu_percent", "memory_percent", "disk_usage", "logged_users", "processes"}
+PROCESS_KEYS = {"pid", "name", "cpu_percent", "memory_percent", "memory_mb", "status",
+                "user", "command", "create_time", "alert"}
+
+
+def test_generate_archive_uses_collector_naming(tmp_path):
+    paths = generate_archive(str(tmp_path), snapshot_count=4, process_count=20,
+                             interval_minutes=5, start=datetime(2026, 1, 1))
+
+    names = sorted(os.listdir(tmp_path))
+    assert [os.path.basename(p) for p in paths] == names
+    assert names[:2] == ["snapshot_20260101_000000.json", "snapshot_20260101_000500.json"]
+    assert all(re.fullmatch(r"snapshot_\d{8}_\d{6}\.json", name) for name in names)
+    assert all(parse_snapshot_time(name) is not None for name in names)
+
+
+def test_snapshot_matches_collector_schema():
+    snapshot = SnapshotGenerator(process_count=200, seed=1).snapshot(datetime(2026, 1, 1))
+
+    assert set(snapshot) == SNAPSHOT_KEYS
+    assert len(snapshot["processes"]) == 200
+    for proc in snapshot["processes"]:
+        assert set(proc) == PROCESS_KEYS
+        assert len(proc["command"]) <= 200
+        if proc["alert"]:
+            assert proc["alert"]["type"] in {"zombie", "high_cpu", "high_memory"}
+    json.dumps(snapshot)
+
+
+def test_generated_archive_has_restart_churn(tmp_path):
+    generate_archive(str(tmp_path), snapshot_count=5, process_count=100, seed=3)
+
+    report = analyze(str(tmp_path)).to_dict()
+
+    assert report["pairs"] == 4
+    assert report["total_restarts"] > 0
+    assert report["total_added"] > 0 and report["total_removed"] > 0
+
+
+def test_generator_is_reproducible():
+    first = SnapshotGenerator(process_count=50, seed=7).snapshot(datetime(2026, 1, 1))
+    second = SnapshotGenerator(process_count=50, seed=7).snapshot(datetime(2026, 1, 1))
+
+    assert first == second